@@ -422,6 +422,51 @@ class MetricsVisualizer:
         return fig
 
 
+def calculate_monthly_revenue(df: pd.DataFrame) -> pd.Series:
+    """
+    Calculate revenue per (year, month).
+    
+    Args:
+        df (pd.DataFrame): Sales data with 'year', 'month' and 'price' columns
+    
+    Returns:
+        pd.Series: float64 revenue indexed by (year, month), observed cells only
+    """
+    return df.groupby(["year", "month"])["price"].sum().astype(np.float64)
+
+
+def calculate_state_revenue(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate revenue per customer state.
+    
+    Sorts rows by the categorical state codes and sums each run with
+    np.add.reduceat, so no merge or hash groupby is needed.
+    
+    Args:
+        df (pd.DataFrame): Sales data with 'price' and 'customer_state'
+            columns; a plain string state column is converted to categorical
+    
+    Returns:
+        pd.DataFrame: 'customer_state' and 'revenue', highest revenue first
+    """
+    state = df["customer_state"]
+    if not isinstance(state.dtype, pd.CategoricalDtype):
+        state = state.astype("category")
+    codes = state.cat.codes.to_numpy()
+    prices = df["price"].to_numpy(dtype=np.float64)
+    known = codes >= 0
+    codes, prices = codes[known], prices[known]
+    if codes.size == 0:
+        return pd.DataFrame({"customer_state": [], "revenue": []})
+    order = np.argsort(codes, kind="stable")
+    codes, prices = codes[order], prices[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    states = state.cat.categories[codes[starts]]
+    return pd.DataFrame(
+        {"customer_state": states, "revenue": np.add.reduceat(prices, starts)}
+    ).sort_values("revenue", ascending=False, ignore_index=True)
+
+
 def format_currency(value: float) -> str:
     """Format a numeric value as currency."""
     return f"${value:,.2f}"
@@ -2,8 +2,11 @@
 E-Commerce Sales Performance Dashboard
 """
 
-import calendar
+import glob
+import math
+import os
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
@@ -11,8 +14,8 @@ import streamlit as st
 from business_metrics import (
     calculate_avg_order_value,
     calculate_category_revenue,
-    calculate_delivery_satisfaction,
     calculate_mom_growth,
+    calculate_monthly_revenue,
     calculate_order_count,
     calculate_revenue,
     calculate_state_revenue,
@@ -25,6 +28,13 @@ from data_loader import (
     prepare_sales_data,
 )
 
+# Optional pyarrow import
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 st.set_page_config(
     page_title="E-Commerce Sales Performance",
     page_icon="📊",
@@ -122,11 +132,29 @@ def fmt_compact(v: float) -> str:
         return f"${v:.0f}"
 
 
+def fmt_compact_vec(values) -> list:
+    """Vectorized fmt_compact: format an array of dollar values in one pass."""
+    v = np.asarray(values, dtype=float)
+    a = np.abs(v)
+    scaled = np.where(a >= 1e6, v / 1e6, np.where(a >= 1e3, v / 1e3, v))
+    suffix = np.where(a >= 1e6, "M", np.where(a >= 1e3, "K", ""))
+    one_decimal = (a >= 1e6) & (scaled % 1 != 0)
+    digits = np.where(
+        one_decimal, np.char.mod("%.1f", scaled), np.char.mod("%.0f", scaled)
+    )
+    return np.char.add(np.char.add("$", digits), suffix).tolist()
+
+
+def isnan(x) -> bool:
+    """Cheap scalar missing-value check: None or a (NumPy) float NaN."""
+    return x is None or (isinstance(x, (float, np.floating)) and x != x)
+
+
 def trend_badge(current, previous, lower_is_better: bool = False) -> str:
     """Return an HTML span with a colored directional trend indicator."""
-    if previous is None or pd.isna(previous) or previous == 0:
+    if isnan(previous) or previous == 0:
         return '<span style="color:#6b7280">—</span>'
-    if current is None or pd.isna(current):
+    if isnan(current):
         return '<span style="color:#6b7280">—</span>'
     pct = (current - previous) / abs(previous) * 100
     positive_outcome = pct < 0 if lower_is_better else pct > 0
@@ -135,355 +163,528 @@ def trend_badge(current, previous, lower_is_better: bool = False) -> str:
     return f'<span style="color:{color}">{arrow} {abs(pct):.2f}%</span>'
 
 
+def _nice_step(max_val: float, n: int) -> float:
+    """Round max_val / (n - 1) up to a single significant digit."""
+    if max_val <= 0:
+        return 0.0
+    raw_step = max_val / (n - 1)
+    magnitude = 10.0 ** math.floor(math.log10(raw_step))
+    return math.ceil(raw_step / magnitude) * magnitude
+
+
 def make_y_ticks(max_val: float, n: int = 5) -> tuple:
     """Compute nicely-spaced tick values and compact string labels."""
-    import math
-
     if max_val <= 0:
         return [0], ["$0"]
-    raw_step = max_val / (n - 1)
-    magnitude = 10 ** math.floor(math.log10(raw_step))
-    nice_step = math.ceil(raw_step / magnitude) * magnitude
+    nice_step = _nice_step(float(max_val), n)
     ticks = [i * nice_step for i in range(n)]
-    labels = [fmt_compact(t) for t in ticks]
+    labels = fmt_compact_vec(ticks)
     return ticks, labels
 
 
 # ── Data Loading (cached) ────────────────────────────────────────────────────
 
-@st.cache_data
+# Datasets the dashboard reads; each needs its own Parquet snapshot
+DATASET_NAMES = ("orders", "order_items", "products", "customers", "reviews")
+CATEGORICAL_COLUMNS = ("order_status", "customer_state", "product_category_name")
+# Narrow dtypes for the sales frame; aggregates are cast back to float at the end
+SALES_DTYPES = {
+    "price": "float32",
+    "freight_value": "float32",
+    "year": "int16",
+    "month": "int8",
+    "day": "int8",
+}
+DELIVERY_BINS = [-np.inf, 3, 7, np.inf]
+DELIVERY_BUCKETS = ["1-3 days", "4-7 days", "8+ days"]
+
+
+def load_cached_datasets(data_dir: str) -> dict:
+    """Load DATASET_NAMES from Parquet snapshots, rewriting them when stale."""
+    if not HAS_PYARROW:
+        datasets = load_datasets(data_dir)
+        return {name: datasets[name] for name in DATASET_NAMES}
+
+    csv_paths = glob.glob(os.path.join(data_dir, "*.csv"))
+    newest_csv = max(map(os.path.getmtime, csv_paths), default=0)
+    pq_paths = {
+        name: os.path.join(data_dir, f"{name}.parquet") for name in DATASET_NAMES
+    }
+    if all(
+        os.path.exists(path) and os.path.getmtime(path) >= newest_csv
+        for path in pq_paths.values()
+    ):
+        return {
+            name: pd.read_parquet(path, engine="pyarrow")
+            for name, path in pq_paths.items()
+        }
+
+    datasets = load_datasets(data_dir)
+    datasets = {name: datasets[name] for name in DATASET_NAMES}
+    for name, df in datasets.items():
+        # Write beside the target and swap in, so a crash never leaves a
+        # truncated snapshot behind
+        tmp_path = f"{pq_paths[name]}.tmp"
+        try:
+            df.to_parquet(tmp_path, engine="pyarrow", compression="snappy")
+            os.replace(tmp_path, pq_paths[name])
+        except (OSError, ValueError, TypeError):
+            # Read-only data directory or a frame pyarrow cannot encode
+            # (ArrowInvalid/ArrowTypeError): serve from memory, uncached
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            break
+    return datasets
+
+
+@st.cache_resource
 def get_base_data():
-    datasets = load_datasets("ecommerce_data")
+    """Shared read-only base frames; callers must not modify what this returns."""
+    datasets = load_cached_datasets("ecommerce_data")
+    for df in datasets.values():
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
     sales_df = prepare_sales_data(datasets["order_items"], datasets["orders"])
     sales_df = add_temporal_features(sales_df, "order_purchase_timestamp")
-    return datasets, sales_df
-
-
-# ── Month abbreviations ──────────────────────────────────────────────────────
-MONTH_ABBRS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-
-# ── App entry point ──────────────────────────────────────────────────────────
-datasets, sales_df = get_base_data()
-
-delivered = sales_df[sales_df["order_status"] == "delivered"].copy()
-available_years = sorted(
-    delivered["year"].dropna().astype(int).unique(), reverse=True
-)
-
-# ── Header ───────────────────────────────────────────────────────────────────
-hdr, _, yr_col, mo_col = st.columns([3, 1, 1, 1])
+    sales_df = sales_df.astype(
+        {col: dtype for col, dtype in SALES_DTYPES.items() if col in sales_df.columns}
+    )
+    sales_df["order_status"] = sales_df["order_status"].astype("category")
+    # order_id -> customer state as a categorical, so state rollups work on codes
+    order_state = (
+        datasets["orders"][["order_id", "customer_id"]]
+        .merge(
+            datasets["customers"][["customer_id", "customer_state"]],
+            on="customer_id",
+        )
+        .drop_duplicates("order_id")
+        .set_index("order_id")["customer_state"]
+        .astype("category")
+    )
+    sales_df["customer_state"] = pd.Categorical(
+        sales_df["order_id"].map(order_state),
+        categories=order_state.cat.categories,
+    )
+    # New columns go through assign, so the slice is never written in place
+    # and downstream code needs no defensive copies
+    delivered = calculate_delivery_speed(
+        sales_df[sales_df["order_status"] == "delivered"]
+    )
+    review_by_order = datasets["reviews"].groupby("order_id")["review_score"].mean()
+    delivered = delivered.assign(
+        delivery_bucket=pd.cut(
+            delivered["delivery_speed"], bins=DELIVERY_BINS, labels=DELIVERY_BUCKETS
+        ),
+        review_score=delivered["order_id"].map(review_by_order),
+    )
+    monthly_rev = calculate_monthly_revenue(delivered)
+    available_years = sorted(
+        delivered["year"].dropna().astype(int).unique().tolist(), reverse=True
+    )
+    return datasets, delivered, monthly_rev, available_years
 
-with hdr:
-    st.markdown("## E-Commerce Sales Performance")
 
-with yr_col:
-    default_yr_idx = available_years.index(2023) if 2023 in available_years else 0
-    analysis_year = st.selectbox("Year", available_years, index=default_yr_idx)
+def get_period_df(year: int, month):
+    """Delivered rows for one (year, month) slice; cached via compute_kpis."""
+    _, delivered, _, _ = get_base_data()
+    return filter_by_period(delivered, year, month)
 
-with mo_col:
-    month_options = ["All Months"] + MONTH_ABBRS
-    selected_month_label = st.selectbox("Month", month_options)
-    analysis_month = (
-        None
-        if selected_month_label == "All Months"
-        else MONTH_ABBRS.index(selected_month_label) + 1
-    )
 
-comparison_year = analysis_year - 1
+@st.cache_data
+def compute_kpis(year: int, month) -> dict:
+    """All KPI scalars and chart frames for one (year, month) slice."""
+    datasets, _, _, _ = get_base_data()
+    df = get_period_df(year, month)
+    return {
+        "empty": df.empty,
+        "revenue": float(calculate_revenue(df)),
+        "aov": float(calculate_avg_order_value(df)),
+        "orders": calculate_order_count(df),
+        "mom": calculate_mom_growth(df),
+        "cat": calculate_category_revenue(df, datasets["products"]).head(10),
+        "state": calculate_state_revenue(df),
+        "sat": df.groupby("delivery_bucket", observed=False)["review_score"].mean(),
+        "review": float(df["review_score"].mean()),
+        "avg_delivery": float(df["delivery_speed"].mean()),
+    }
+
+
+# ── Figure skeletons ─────────────────────────────────────────────────────────
+# Each chart is built once per session and kept in st.session_state; reruns
+# only swap in the new trace data and axis ticks.
+
+PLOT_CONFIG = {"displayModeBar": False}
+
+# Category bar shades for every possible bar count (the chart shows the top 10),
+# lightest at the bottom and darkest at the top
+CAT_COLORS = {
+    n: [f"rgba(44,95,138,{0.35 + 0.65 * i / max(n - 1, 1):.2f})" for i in range(n)]
+    for n in range(11)
+}
 
-# ── Filtering ────────────────────────────────────────────────────────────────
-current_df = calculate_delivery_speed(
-    filter_by_period(delivered, analysis_year, analysis_month)
+TREND_LAYOUT = dict(
+    title="Revenue Trend",
+    hovermode="x unified",
+    plot_bgcolor="white",
+    xaxis=dict(showgrid=True, gridcolor="#f0f2f5"),
+    yaxis=dict(showgrid=True, gridcolor="#f0f2f5"),
+    height=350,
+    margin=dict(t=50, b=40, l=60, r=20),
+    legend=dict(orientation="h", y=1.05, x=1, xanchor="right"),
+    uirevision="constant",
 )
-comparison_df = calculate_delivery_speed(
-    filter_by_period(delivered, comparison_year, analysis_month)
+CAT_LAYOUT = dict(
+    title="Top 10 Categories",
+    plot_bgcolor="white",
+    xaxis=dict(showgrid=True, gridcolor="#f0f2f5"),
+    yaxis=dict(showgrid=False),
+    height=350,
+    margin=dict(t=50, b=40, l=160, r=80),
+)
+MAP_LAYOUT = dict(
+    title="Revenue by State",
+    geo_scope="usa",
+    height=350,
+    margin=dict(t=50, b=10, l=10, r=10),
+)
+SAT_LAYOUT = dict(
+    title="Review Score vs Delivery Time",
+    plot_bgcolor="white",
+    xaxis=dict(showgrid=False),
+    yaxis=dict(showgrid=True, gridcolor="#f0f2f5", range=[0, 5.4]),
+    height=350,
+    margin=dict(t=50, b=40, l=50, r=20),
 )
-has_comparison = not comparison_df.empty
-
-# ── KPI Calculations ──────────────────────────────────────────────────────────
-revenue = calculate_revenue(current_df)
-prev_rev = calculate_revenue(comparison_df) if has_comparison else None
-
-aov = calculate_avg_order_value(current_df)
-prev_aov = calculate_avg_order_value(comparison_df) if has_comparison else None
-
-orders = calculate_order_count(current_df)
-prev_orders = calculate_order_count(comparison_df) if has_comparison else None
-
-mom_series = calculate_mom_growth(current_df)
-avg_mom = mom_series.mean() if not mom_series.dropna().empty else 0.0
-mom_color = "#16a34a" if avg_mom > 0 else "#dc2626"
-mom_arrow = "↑" if avg_mom > 0 else "↓"
-
-# ── KPI Row ───────────────────────────────────────────────────────────────────
-kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-
-with kpi1:
-    st.markdown(
-        f"""
-    <div class="kpi-card">
-        <p class="kpi-label">Total Revenue</p>
-        <p class="kpi-value">{fmt_compact(revenue)}</p>
-        <p class="kpi-trend">{trend_badge(revenue, prev_rev)}</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
-
-with kpi2:
-    st.markdown(
-        f"""
-    <div class="kpi-card">
-        <p class="kpi-label">Avg Monthly Growth</p>
-        <p class="kpi-value">{avg_mom:+.2f}%</p>
-        <p class="kpi-trend"><span style="color:{mom_color}">{mom_arrow}</span></p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
-
-with kpi3:
-    aov_display = fmt_compact(aov) if not pd.isna(aov) else "—"
-    st.markdown(
-        f"""
-    <div class="kpi-card">
-        <p class="kpi-label">Avg Order Value</p>
-        <p class="kpi-value">{aov_display}</p>
-        <p class="kpi-trend">{trend_badge(aov, prev_aov)}</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
-
-with kpi4:
-    st.markdown(
-        f"""
-    <div class="kpi-card">
-        <p class="kpi-label">Total Orders</p>
-        <p class="kpi-value">{orders:,}</p>
-        <p class="kpi-trend">{trend_badge(orders, prev_orders)}</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
 
-st.markdown("<br>", unsafe_allow_html=True)
 
-# ── Chart Row 1 ───────────────────────────────────────────────────────────────
-chart1, chart2 = st.columns(2)
+def get_figure(key: str, build) -> go.Figure:
+    """Return the session's figure for `key`, building it on first use."""
+    if key not in st.session_state:
+        st.session_state[key] = build()
+    return st.session_state[key]
 
-with chart1:
-    cur_monthly = (
-        current_df.groupby("month")["price"]
-        .sum()
-        .reindex(range(1, 13))
-        .dropna()
-    )
-    comp_monthly = (
-        comparison_df.groupby("month")["price"]
-        .sum()
-        .reindex(range(1, 13))
-        .dropna()
-        if has_comparison
-        else pd.Series(dtype=float)
-    )
 
-    max_rev = max(
-        cur_monthly.max() if not cur_monthly.empty else 0,
-        comp_monthly.max() if not comp_monthly.empty else 0,
-    )
-    yticks, ytick_labels = make_y_ticks(max_rev)
-
-    fig_trend = go.Figure()
-    if not cur_monthly.empty:
-        fig_trend.add_trace(
-            go.Scatter(
-                x=[calendar.month_abbr[m] for m in cur_monthly.index],
-                y=cur_monthly.values,
-                mode="lines+markers",
-                name=str(analysis_year),
-                line=dict(color="#2C5F8A", width=2.5),
-                marker=dict(size=7),
-                hovertemplate="%{x}: %{customdata}<extra></extra>",
-                customdata=[fmt_compact(v) for v in cur_monthly.values],
-            )
+def build_trend_fig() -> go.Figure:
+    """Revenue trend skeleton: current and comparison year traces."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scattergl(
+            mode="lines+markers",
+            line=dict(color="#2C5F8A", width=2.5),
+            marker=dict(size=7),
+            hovertemplate="%{x}: %{customdata}<extra></extra>",
         )
-    if not comp_monthly.empty:
-        fig_trend.add_trace(
-            go.Scatter(
-                x=[calendar.month_abbr[m] for m in comp_monthly.index],
-                y=comp_monthly.values,
-                mode="lines+markers",
-                name=str(comparison_year),
-                line=dict(color="#9CA3AF", width=2, dash="dash"),
-                marker=dict(size=6),
-                hovertemplate="%{x}: %{customdata}<extra></extra>",
-                customdata=[fmt_compact(v) for v in comp_monthly.values],
-            )
+    )
+    fig.add_trace(
+        go.Scattergl(
+            mode="lines+markers",
+            line=dict(color="#9CA3AF", width=2, dash="dash"),
+            marker=dict(size=6),
+            hovertemplate="%{x}: %{customdata}<extra></extra>",
         )
-    fig_trend.update_layout(
-        title="Revenue Trend",
-        hovermode="x unified",
-        plot_bgcolor="white",
-        xaxis=dict(showgrid=True, gridcolor="#f0f2f5"),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor="#f0f2f5",
-            tickvals=yticks,
-            ticktext=ytick_labels,
-        ),
-        height=350,
-        margin=dict(t=50, b=40, l=60, r=20),
-        legend=dict(orientation="h", y=1.05, x=1, xanchor="right"),
     )
-    st.plotly_chart(fig_trend, use_container_width=True, config={"displayModeBar": False})
+    fig.update_layout(**TREND_LAYOUT)
+    return fig
 
-with chart2:
-    cat_rev = calculate_category_revenue(current_df, datasets["products"]).head(10)
-    cat_rev = cat_rev.iloc[::-1]  # Reverse so highest bar is at the top
-    n = len(cat_rev)
-    colors = [
-        f"rgba(44,95,138,{0.35 + 0.65 * i / max(n - 1, 1):.2f})"
-        for i in range(n)
-    ]
 
-    x_max = cat_rev.max() if not cat_rev.empty else 1
-    xticks, xtick_labels = make_y_ticks(x_max, n=5)
-
-    fig_cat = go.Figure(
+def build_cat_fig() -> go.Figure:
+    """Top-categories horizontal bar skeleton."""
+    fig = go.Figure(
         go.Bar(
-            y=cat_rev.index,
-            x=cat_rev.values,
             orientation="h",
-            marker_color=colors,
-            text=[fmt_compact(v) for v in cat_rev.values],
             textposition="outside",
             hovertemplate="%{y}: %{text}<extra></extra>",
             textfont=dict(size=11),
         )
     )
-    fig_cat.update_layout(
-        title="Top 10 Categories",
-        plot_bgcolor="white",
-        xaxis=dict(
-            showgrid=True,
-            gridcolor="#f0f2f5",
-            tickvals=xticks,
-            ticktext=xtick_labels,
-        ),
-        yaxis=dict(showgrid=False),
-        height=350,
-        margin=dict(t=50, b=40, l=160, r=80),
-    )
-    st.plotly_chart(fig_cat, use_container_width=True, config={"displayModeBar": False})
+    fig.update_layout(**CAT_LAYOUT)
+    return fig
 
-# ── Chart Row 2 ───────────────────────────────────────────────────────────────
-chart3, chart4 = st.columns(2)
 
-with chart3:
-    state_rev = calculate_state_revenue(
-        current_df, datasets["orders"], datasets["customers"]
-    )
-
-    fig_map = go.Figure(
+def build_map_fig() -> go.Figure:
+    """US state revenue choropleth skeleton."""
+    fig = go.Figure(
         go.Choropleth(
-            locations=state_rev["customer_state"],
-            z=state_rev["revenue"],
             locationmode="USA-states",
             colorscale="Blues",
             showscale=True,
             colorbar=dict(title="Revenue", tickformat="$~s"),
         )
     )
-    fig_map.update_layout(
-        title="Revenue by State",
-        geo_scope="usa",
-        height=350,
-        margin=dict(t=50, b=10, l=10, r=10),
-    )
-    st.plotly_chart(fig_map, use_container_width=True, config={"displayModeBar": False})
-
-with chart4:
-    sat_df = calculate_delivery_satisfaction(current_df, datasets["reviews"])
-    buckets = ["1-3 days", "4-7 days", "8+ days"]
-    bucket_means = (
-        sat_df[sat_df["delivery_bucket"] != "Unknown"]
-        .groupby("delivery_bucket")["review_score"]
-        .mean()
-        .reindex(buckets)
-    )
+    fig.update_layout(**MAP_LAYOUT)
+    return fig
 
-    fig_sat = go.Figure(
-        go.Bar(
-            x=bucket_means.index,
-            y=bucket_means.values,
-            marker_color="#2C5F8A",
-            text=[f"{v:.2f}" if not pd.isna(v) else "" for v in bucket_means.values],
-            textposition="outside",
+
+def build_sat_fig() -> go.Figure:
+    """Review score by delivery-time bucket bar skeleton."""
+    fig = go.Figure(go.Bar(marker_color="#2C5F8A", textposition="outside"))
+    fig.update_layout(**SAT_LAYOUT)
+    return fig
+
+
+# ── Month abbreviations ──────────────────────────────────────────────────────
+MONTH_ABBRS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MONTH_ABBRS_ARR = np.array(MONTH_ABBRS)
+
+# ── App entry point ──────────────────────────────────────────────────────────
+# Page config, CSS and data loading run only on full reruns. The dashboard
+# body is a fragment, so changing Year/Month reruns just that part while the
+# CSS element and the loaded frames stay in place.
+_, _, monthly_rev, available_years = get_base_data()
+
+
+@st.fragment
+def render_dashboard():
+    """Header controls plus every section they drive."""
+    # ── Header ───────────────────────────────────────────────────────────────
+    hdr, _, yr_col, mo_col = st.columns([3, 1, 1, 1])
+
+    with hdr:
+        st.markdown("## E-Commerce Sales Performance")
+
+    with yr_col:
+        default_yr_idx = available_years.index(2023) if 2023 in available_years else 0
+        analysis_year = st.selectbox("Year", available_years, index=default_yr_idx)
+
+    with mo_col:
+        month_options = ["All Months"] + MONTH_ABBRS
+        selected_month_label = st.selectbox("Month", month_options)
+        analysis_month = (
+            None
+            if selected_month_label == "All Months"
+            else MONTH_ABBRS.index(selected_month_label) + 1
         )
-    )
-    fig_sat.update_layout(
-        title="Review Score vs Delivery Time",
-        plot_bgcolor="white",
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor="#f0f2f5", range=[0, 5.4]),
-        height=350,
-        margin=dict(t=50, b=40, l=50, r=20),
-    )
-    st.plotly_chart(fig_sat, use_container_width=True, config={"displayModeBar": False})
 
-st.markdown("<br>", unsafe_allow_html=True)
+    comparison_year = analysis_year - 1
+
+    # ── KPI Calculations ──────────────────────────────────────────────────────
+    kpis = compute_kpis(analysis_year, analysis_month)
+    prev_kpis = compute_kpis(comparison_year, analysis_month)
+    has_comparison = not prev_kpis["empty"]
+
+    revenue = kpis["revenue"]
+    prev_rev = prev_kpis["revenue"] if has_comparison else None
+
+    aov = kpis["aov"]
+    prev_aov = prev_kpis["aov"] if has_comparison else None
+
+    orders = kpis["orders"]
+    prev_orders = prev_kpis["orders"] if has_comparison else None
+
+    avg_delivery = kpis["avg_delivery"]
+    prev_delivery = prev_kpis["avg_delivery"] if has_comparison else None
+
+    # One satisfaction rollup feeds both the bucket chart and the review card
+    bucket_means = kpis["sat"]
+    avg_review = kpis["review"]
+
+    trends = {
+        k: trend_badge(*v)
+        for k, v in {
+            "revenue": (revenue, prev_rev),
+            "aov": (aov, prev_aov),
+            "orders": (orders, prev_orders),
+            "delivery": (avg_delivery, prev_delivery, True),
+        }.items()
+    }
+
+    mom_series = kpis["mom"]
+    avg_mom = mom_series.mean() if not mom_series.dropna().empty else 0.0
+    mom_color = "#16a34a" if avg_mom > 0 else "#dc2626"
+    mom_arrow = "↑" if avg_mom > 0 else "↓"
+
+    # ── KPI Row ───────────────────────────────────────────────────────────────
+    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+
+    with kpi1:
+        st.markdown(
+            f"""
+        <div class="kpi-card">
+            <p class="kpi-label">Total Revenue</p>
+            <p class="kpi-value">{fmt_compact(revenue)}</p>
+            <p class="kpi-trend">{trends["revenue"]}</p>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
 
-# ── Bottom Row ────────────────────────────────────────────────────────────────
-bot1, bot2 = st.columns(2)
+    with kpi2:
+        st.markdown(
+            f"""
+        <div class="kpi-card">
+            <p class="kpi-label">Avg Monthly Growth</p>
+            <p class="kpi-value">{avg_mom:+.2f}%</p>
+            <p class="kpi-trend"><span style="color:{mom_color}">{mom_arrow}</span></p>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
 
-avg_delivery = (
-    current_df["delivery_speed"].mean()
-    if "delivery_speed" in current_df.columns
-    else float("nan")
-)
-prev_delivery = (
-    comparison_df["delivery_speed"].mean()
-    if (has_comparison and "delivery_speed" in comparison_df.columns)
-    else None
-)
+    with kpi3:
+        aov_display = fmt_compact(aov) if not isnan(aov) else "—"
+        st.markdown(
+            f"""
+        <div class="kpi-card">
+            <p class="kpi-label">Avg Order Value</p>
+            <p class="kpi-value">{aov_display}</p>
+            <p class="kpi-trend">{trends["aov"]}</p>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
 
-with bot1:
-    del_val = f"{avg_delivery:.2f} days" if not pd.isna(avg_delivery) else "—"
-    st.markdown(
-        f"""
-    <div class="bottom-card">
-        <p class="bottom-label">Average Delivery Time</p>
-        <p class="bottom-value">{del_val}</p>
-        <p class="bottom-trend">{trend_badge(avg_delivery, prev_delivery, lower_is_better=True)}</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
+    with kpi4:
+        st.markdown(
+            f"""
+        <div class="kpi-card">
+            <p class="kpi-label">Total Orders</p>
+            <p class="kpi-value">{orders:,}</p>
+            <p class="kpi-trend">{trends["orders"]}</p>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
 
-rev_df = calculate_delivery_satisfaction(current_df, datasets["reviews"])
-avg_review = (
-    rev_df["review_score"].mean()
-    if "review_score" in rev_df.columns
-    else float("nan")
-)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-with bot2:
-    if not pd.isna(avg_review):
-        filled = round(avg_review)
-        stars = "★" * filled + "☆" * (5 - filled)
-        review_val = f"{avg_review:.2f}"
-    else:
-        stars = "☆☆☆☆☆"
-        review_val = "—"
-    st.markdown(
-        f"""
-    <div class="bottom-card">
-        <p class="bottom-value">{review_val}</p>
-        <p class="stars">{stars}</p>
-        <p class="bottom-label">Average Review Score</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
+    # ── Chart Row 1 ───────────────────────────────────────────────────────────
+    chart1, chart2 = st.columns(2)
+
+    with chart1:
+        # Trend line always shows the full year, even when a month is selected.
+        # monthly_rev only holds observed months, already in calendar order.
+        cur_monthly = monthly_rev.loc[analysis_year]
+        comp_monthly = (
+            monthly_rev.loc[comparison_year]
+            if comparison_year in monthly_rev.index.get_level_values("year")
+            else pd.Series(dtype=float)
+        )
+
+        max_rev = max(
+            cur_monthly.max() if not cur_monthly.empty else 0,
+            comp_monthly.max() if not comp_monthly.empty else 0,
+        )
+        yticks, ytick_labels = make_y_ticks(max_rev)
+
+        fig_trend = get_figure("fig_trend", build_trend_fig)
+        fig_trend.data[0].update(
+            x=MONTH_ABBRS_ARR[cur_monthly.index.to_numpy() - 1],
+            y=cur_monthly.values,
+            name=str(analysis_year),
+            customdata=fmt_compact_vec(cur_monthly.values),
+            visible=not cur_monthly.empty,
+        )
+        fig_trend.data[1].update(
+            x=MONTH_ABBRS_ARR[comp_monthly.index.to_numpy() - 1],
+            y=comp_monthly.values,
+            name=str(comparison_year),
+            customdata=fmt_compact_vec(comp_monthly.values),
+            visible=not comp_monthly.empty,
+        )
+        fig_trend.update_yaxes(tickvals=yticks, ticktext=ytick_labels)
+        st.plotly_chart(
+            fig_trend,
+            key="trend_chart",
+            use_container_width=True,
+            config=PLOT_CONFIG,
+        )
+
+    with chart2:
+        cat_rev = kpis["cat"]
+
+        x_max = cat_rev.max() if not cat_rev.empty else 1
+        xticks, xtick_labels = make_y_ticks(x_max, n=5)
+
+        fig_cat = get_figure("fig_cat", build_cat_fig)
+        fig_cat.data[0].update(
+            # Reversed slices so the highest bar is at the top
+            y=cat_rev.index[::-1],
+            x=cat_rev.values[::-1],
+            marker_color=CAT_COLORS[len(cat_rev)],
+            text=fmt_compact_vec(cat_rev.values[::-1]),
+        )
+        fig_cat.update_xaxes(tickvals=xticks, ticktext=xtick_labels)
+        st.plotly_chart(
+            fig_cat,
+            key="cat_chart",
+            use_container_width=True,
+            config=PLOT_CONFIG,
+        )
+
+    # ── Chart Row 2 ───────────────────────────────────────────────────────────
+    chart3, chart4 = st.columns(2)
+
+    with chart3:
+        state_rev = kpis["state"]
+
+        fig_map = get_figure("fig_map", build_map_fig)
+        fig_map.data[0].update(
+            locations=state_rev["customer_state"],
+            z=state_rev["revenue"],
+        )
+        st.plotly_chart(
+            fig_map,
+            key="map_chart",
+            use_container_width=True,
+            config=PLOT_CONFIG,
+        )
+
+    with chart4:
+        fig_sat = get_figure("fig_sat", build_sat_fig)
+        fig_sat.data[0].update(
+            x=DELIVERY_BUCKETS,
+            y=bucket_means.values,
+            text=np.where(
+                np.isnan(bucket_means.values),
+                "",
+                np.char.mod("%.2f", bucket_means.values),
+            ).tolist(),
+        )
+        st.plotly_chart(
+            fig_sat,
+            key="sat_chart",
+            use_container_width=True,
+            config=PLOT_CONFIG,
+        )
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # ── Bottom Row ────────────────────────────────────────────────────────────
+    bot1, bot2 = st.columns(2)
+
+    with bot1:
+        del_val = f"{avg_delivery:.2f} days" if not isnan(avg_delivery) else "—"
+        st.markdown(
+            f"""
+        <div class="bottom-card">
+            <p class="bottom-label">Average Delivery Time</p>
+            <p class="bottom-value">{del_val}</p>
+            <p class="bottom-trend">{trends["delivery"]}</p>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
+
+    with bot2:
+        if not isnan(avg_review):
+            filled = round(avg_review)
+            stars = "★" * filled + "☆" * (5 - filled)
+            review_val = f"{avg_review:.2f}"
+        else:
+            stars = "☆☆☆☆☆"
+            review_val = "—"
+        st.markdown(
+            f"""
+        <div class="bottom-card">
+            <p class="bottom-value">{review_val}</p>
+            <p class="stars">{stars}</p>
+            <p class="bottom-label">Average Review Score</p>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
+
+
+render_dashboard()
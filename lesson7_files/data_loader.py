@@ -178,10 +178,7 @@ class EcommerceDataLoader:
         
         # Calculate delivery metrics
         if 'order_delivered_customer_date' in sales_data.columns and 'order_purchase_timestamp' in sales_data.columns:
-            sales_data['delivery_days'] = (
-                sales_data['order_delivered_customer_date'] - 
-                sales_data['order_purchase_timestamp']
-            ).dt.days
+            sales_data['delivery_days'] = calculate_delivery_speed(sales_data)['delivery_speed']
         
         return sales_data
     
@@ -251,6 +248,27 @@ def categorize_delivery_speed(days: float) -> str:
         return '8+ days'
 
 
+def calculate_delivery_speed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add a delivery_speed column: whole days from purchase to customer delivery.
+    
+    Returns a new frame via assign and never writes into the input, so it is
+    safe to call on slices without a defensive copy.
+    
+    Args:
+        df (pd.DataFrame): Sales data with 'order_purchase_timestamp' and
+            'order_delivered_customer_date' datetime columns
+    
+    Returns:
+        pd.DataFrame: Input columns plus float32 'delivery_speed' (NaN if undelivered)
+    """
+    return df.assign(
+        delivery_speed=(
+            df['order_delivered_customer_date'] - df['order_purchase_timestamp']
+        ).dt.days.astype('float32')
+    )
+
+
 def load_and_process_data(data_path: str = 'ecommerce_data/') -> Tuple[EcommerceDataLoader, Dict[str, pd.DataFrame]]:
     """
     Convenience function to load and process all data.